@@ -1,7 +1,8 @@
-import re
+import sys
+from collections import namedtuple
 
 # --- Instruction Set Definition ---
-# Maps mnemonic to its opcode and operand format.
+# Maps mnemonic to an (opcode, operand format) tuple; opcodes are 4-bit ints.
 # Operand formats:
 #   - "": No operand (e.g., NOP, HLT)
 #   - "reg_port": Register (2-bit) and Port (2-bit) (e.g., IN Rn, P -> nppp)
@@ -10,34 +11,43 @@ import re
 #   - "reg": Register (2-bit) (e.g., DEC Rn -> n000)
 #   - "address": 4-bit Address (e.g., JMP addr -> aaaa)
 INSTRUCTION_SET = {
-    "NOP": {"opcode": "0000", "format": ""},
-    "HLT": {"opcode": "0001", "format": ""},
-    "IN":  {"opcode": "0010", "format": "reg_port"},
-    "OUT": {"opcode": "0011", "format": "reg_port"},
-    "MOV": {"opcode": "0100", "format": "reg_reg"},
-    "LDI": {"opcode": "0101", "format": "reg_imm2"},
-    "ADD": {"opcode": "0110", "format": "reg_reg"},
-    "SUB": {"opcode": "0111", "format": "reg_reg"},
-    "DEC": {"opcode": "1000", "format": "reg"},
-    "JMP": {"opcode": "1001", "format": "address"},
-    "JZ":  {"opcode": "1010", "format": "address"},
+    "NOP": (0b0000, ""),
+    "HLT": (0b0001, ""),
+    "IN":  (0b0010, "reg_port"),
+    "OUT": (0b0011, "reg_port"),
+    "MOV": (0b0100, "reg_reg"),
+    "LDI": (0b0101, "reg_imm2"),
+    "ADD": (0b0110, "reg_reg"),
+    "SUB": (0b0111, "reg_reg"),
+    "DEC": (0b1000, "reg"),
+    "JMP": (0b1001, "address"),
+    "JZ":  (0b1010, "address"),
 }
 
 # --- Register Encoding (2-bit) ---
 REGISTERS = {
-    "R0": "00",
-    "R1": "01",
-    "R2": "10",
-    "R3": "11",
+    "R0": 0b00,
+    "R1": 0b01,
+    "R2": 0b10,
+    "R3": 0b11,
 }
 
 # --- Port Encoding (2-bit, based on 4-bit operand split) ---
 # Note: Limited to 4 ports due to 2-bit port addressing in IN/OUT format.
 PORTS = {
-    "LIGHT_PORT": "00",
-    "MOTION_PORT": "01",
-    "DUMMY_PORT_A": "10", # Placeholder for a 3rd port if needed, e.g., LOAD_CNT_U_PORT
-    "DUMMY_PORT_B": "11", # Placeholder for a 4th port if needed, e.g., LOAD_CNT_T_PORT
+    "LIGHT_PORT": 0b00,
+    "MOTION_PORT": 0b01,
+    "DUMMY_PORT_A": 0b10, # Placeholder for a 3rd port if needed, e.g., LOAD_CNT_U_PORT
+    "DUMMY_PORT_B": 0b11, # Placeholder for a 4th port if needed, e.g., LOAD_CNT_T_PORT
+}
+
+# --- Immediate Encoding (2-bit) ---
+# Maps the only legal LDI immediate digits to their values.
+IMMEDIATES_2BIT = {
+    "00": 0b00,
+    "01": 0b01,
+    "10": 0b10,
+    "11": 0b11,
 }
 
 # --- Assembly Code ---
@@ -108,28 +118,30 @@ LIGHT_OFF:
 ; This program fits within the 16-instruction limit of a 4-bit PC.
 """
 
-def parse_assembly(assembly_code):
+# A parsed instruction line.
+Insn = namedtuple("Insn", "address mnemonic operands")
+
+# Characters dropped from operand strings (spaces and the '#' immediate prefix).
+_OPERAND_CLEAN = str.maketrans("", "", " #")
+
+def _iter_instructions(assembly_code, labels):
     """
-    Parses the assembly code, extracts labels and instructions.
-    Returns a list of (label, mnemonic, operands) tuples and a dict of labels.
+    Yields (address, mnemonic, operands) for each instruction in the assembly code.
+    Labels are recorded into the given dict as they are encountered.
     """
-    lines = assembly_code.strip().split('\n')
-    parsed_lines = []
-    labels = {}
+    # Strip comments and drop blank/.EQU lines up front
+    lines = [
+        line
+        for line in (raw.split(';', 1)[0].strip() for raw in assembly_code.splitlines())
+        if line and not line.startswith('.EQU')
+    ]
     current_address = 0
 
     for line in lines:
-        line = line.strip()
-        if not line or line.startswith(';') or line.startswith('.EQU'):
-            continue
-
-        # Remove comments after instruction
-        line = line.split(';')[0].strip()
-
         # Check for label
         if ':' in line:
             label = line.split(':')[0].strip()
-            labels[label] = format(current_address, '04b') # Store address as 4-bit binary string
+            labels[label] = current_address # Store address as an int (range-checked when used)
             line = line.split(':', 1)[1].strip() # Remove label from line
 
         if not line: # Line might have only been a label
@@ -139,112 +151,202 @@ def parse_assembly(assembly_code):
         parts = line.split(maxsplit=1)
         mnemonic = parts[0].upper()
         operands = parts[1] if len(parts) > 1 else ""
-        operands = operands.replace(" ", "").replace("#", "") # Clean up operands
+        operands = operands.translate(_OPERAND_CLEAN) # Clean up operands
 
-        parsed_lines.append({"address": current_address, "mnemonic": mnemonic, "operands": operands})
+        yield current_address, mnemonic, operands
         current_address += 1
 
+def parse_assembly(assembly_code):
+    """
+    Parses the assembly code, extracts labels and instructions.
+    Returns a list of Insn (address, mnemonic, operands) tuples and a dict of labels.
+    """
+    labels = {}
+    parsed_lines = [Insn._make(insn) for insn in _iter_instructions(assembly_code, labels)]
     return parsed_lines, labels
 
+# --- Operand Handlers ---
+# Each handler encodes the 4-bit operand field (as an int) for one operand format.
+def _split_pair(mnemonic, operands):
+    """
+    Splits a two-operand string on its single comma, rejecting malformed input.
+    """
+    if operands.count(',') != 1:
+        raise ValueError(f"{mnemonic} instruction expects two comma-separated operands, got: '{operands}'")
+    return operands.split(',', 1)
+
+def _h_none(mnemonic, operands, labels): # NOP, HLT
+    return 0b0000
+
+def _h_reg_port(mnemonic, operands, labels): # IN Rn, P or OUT Rn, P
+    reg, port = _split_pair(mnemonic, operands)
+    reg = reg.strip()
+    port = port.strip()
+    if reg not in REGISTERS:
+        raise ValueError(f"Unknown register: {reg} in {mnemonic} instruction")
+    if port not in PORTS:
+        raise ValueError(f"Unknown port: {port} in {mnemonic} instruction")
+    return REGISTERS[reg] << 2 | PORTS[port] # nppp format (n=2bit, p=2bit)
+
+def _h_reg_reg(mnemonic, operands, labels): # MOV Rd, Rs, ADD Rd, Rs, SUB Rd, Rs
+    dest_reg, src_reg = _split_pair(mnemonic, operands)
+    dest_reg = dest_reg.strip()
+    src_reg = src_reg.strip()
+    if dest_reg not in REGISTERS or src_reg not in REGISTERS:
+        raise ValueError(f"Unknown register in {mnemonic} instruction: {operands}")
+    return REGISTERS[dest_reg] << 2 | REGISTERS[src_reg] # dsrc format (d=2bit, s=2bit)
+
+def _h_reg_imm2(mnemonic, operands, labels): # LDI Rn, #Imm (2-bit immediate)
+    reg, imm = _split_pair(mnemonic, operands)
+    reg = reg.strip()
+    imm = imm.strip()
+    # Ensure immediate is 2-bit binary (e.g., '00b' -> '00')
+    imm_val = imm.replace('b', '')
+    if reg not in REGISTERS:
+        raise ValueError(f"Unknown register: {reg} in {mnemonic} instruction")
+    if imm_val not in IMMEDIATES_2BIT:
+        raise ValueError(f"Immediate value '{imm}' for LDI must be 2-bit binary (e.g., 00b, 11b).")
+    return REGISTERS[reg] << 2 | IMMEDIATES_2BIT[imm_val] # nimm format (n=2bit, imm=2bit)
+
+def _h_reg(mnemonic, operands, labels): # DEC Rn
+    reg = operands.strip()
+    if reg not in REGISTERS:
+        raise ValueError(f"Unknown register: {reg} in {mnemonic} instruction")
+    return REGISTERS[reg] << 2 # n000 format (n=2bit, rest 0)
+
+def _h_address(mnemonic, operands, labels): # JMP addr, JZ addr
+    target_label = operands.strip()
+    if target_label not in labels:
+        raise ValueError(f"Undefined label: {target_label} in {mnemonic} instruction")
+    address = labels[target_label]
+    if address > 0b1111:
+        raise ValueError(f"Label {target_label} at address {address} does not fit in 4 bits")
+    return address # aaaa format (4-bit address)
+
+# Maps operand format to its handler (one dict lookup per instruction).
+_HANDLERS = {
+    "": _h_none,
+    "reg_port": _h_reg_port,
+    "reg_reg": _h_reg_reg,
+    "reg_imm2": _h_reg_imm2,
+    "reg": _h_reg,
+    "address": _h_address,
+}
+
+def _decode(mnemonic):
+    """
+    Returns (opcode shifted into the high nibble, operand format, handler) for a mnemonic.
+    """
+    if mnemonic not in INSTRUCTION_SET:
+        raise ValueError(f"Unknown mnemonic: {mnemonic}")
+
+    opcode, fmt = INSTRUCTION_SET[mnemonic]
+
+    handler = _HANDLERS.get(fmt)
+    if handler is None:
+        raise ValueError(f"Unhandled format '{fmt}' for mnemonic: {mnemonic}")
+    return opcode << 4, fmt, handler
+
+def _build_encode_table():
+    """
+    Enumerates every legal non-jump (mnemonic, cleaned operands) pair and its encoded byte.
+    """
+    operand_forms = {
+        "": [""],
+        "reg_port": [f"{r},{p}" for r in REGISTERS for p in PORTS],
+        "reg_reg": [f"{d},{s}" for d in REGISTERS for s in REGISTERS],
+        "reg_imm2": [f"{r},{i}{suffix}" for r in REGISTERS for i in IMMEDIATES_2BIT for suffix in ("b", "")],
+        "reg": list(REGISTERS),
+    }
+    table = {}
+    for mnemonic in INSTRUCTION_SET:
+        opcode_bits, fmt, handler = _decode(mnemonic)
+        for operands in operand_forms.get(fmt, ()):
+            table[mnemonic, operands] = opcode_bits | handler(mnemonic, operands, None)
+    return table
+
+# Fast path: one lookup per instruction. Anything not found here (jumps,
+# unusual spellings, errors) goes through _decode and the format handlers.
+_ENCODE = _build_encode_table()
+
+# Mnemonics whose operand is a label, which may be a forward reference.
+_JUMP_MNEMONICS = {mnemonic for mnemonic, (_, fmt) in INSTRUCTION_SET.items() if fmt == "address"}
+
+def _encode(mnemonic, operands, labels):
+    """
+    Encodes one instruction as an 8-bit int.
+    """
+    byte = _ENCODE.get((mnemonic, operands))
+    if byte is None:
+        opcode_bits, _, handler = _decode(mnemonic)
+        byte = opcode_bits | handler(mnemonic, operands, labels)
+    return byte
+
 def translate_to_machine_code(parsed_lines, labels):
     """
-    Translates parsed assembly lines into 8-bit binary machine code.
+    Translates parsed assembly lines into 8-bit machine code.
+    Each instruction is returned as an int in the range 0-255.
     """
-    machine_code_binary = []
+    machine_code = []
 
     for instruction_data in parsed_lines:
-        mnemonic = instruction_data["mnemonic"]
-        operands = instruction_data["operands"]
-        
-        if mnemonic not in INSTRUCTION_SET:
-            raise ValueError(f"Unknown mnemonic: {mnemonic}")
-
-        opcode_info = INSTRUCTION_SET[mnemonic]
-        opcode = opcode_info["opcode"]
-        fmt = opcode_info["format"]
-        operand_binary = ""
-
-        if fmt == "": # NOP, HLT
-            operand_binary = "0000"
-        elif fmt == "reg_port": # IN Rn, P or OUT Rn, P
-            parts = operands.split(',')
-            reg = parts[0].strip()
-            port = parts[1].strip()
-            if reg not in REGISTERS:
-                raise ValueError(f"Unknown register: {reg} in {mnemonic} instruction")
-            if port not in PORTS:
-                raise ValueError(f"Unknown port: {port} in {mnemonic} instruction")
-            operand_binary = REGISTERS[reg] + PORTS[port] # nppp format (n=2bit, p=2bit)
-        elif fmt == "reg_reg": # MOV Rd, Rs, ADD Rd, Rs, SUB Rd, Rs
-            parts = operands.split(',')
-            dest_reg = parts[0].strip()
-            src_reg = parts[1].strip()
-            if dest_reg not in REGISTERS or src_reg not in REGISTERS:
-                raise ValueError(f"Unknown register in {mnemonic} instruction: {operands}")
-            operand_binary = REGISTERS[dest_reg] + REGISTERS[src_reg] # dsrc format (d=2bit, s=2bit)
-        elif fmt == "reg_imm2": # LDI Rn, #Imm (2-bit immediate)
-            parts = operands.split(',')
-            reg = parts[0].strip()
-            imm = parts[1].strip()
-            if reg not in REGISTERS:
-                raise ValueError(f"Unknown register: {reg} in {mnemonic} instruction")
-            # Ensure immediate is 2-bit binary (e.g., '00b' -> '00')
-            imm_val = imm.replace('b', '')
-            if not re.fullmatch(r'[01]{2}', imm_val):
-                raise ValueError(f"Immediate value '{imm}' for LDI must be 2-bit binary (e.g., 00b, 11b).")
-            operand_binary = REGISTERS[reg] + imm_val # nimm format (n=2bit, imm=2bit)
-        elif fmt == "reg": # DEC Rn
-            reg = operands.strip()
-            if reg not in REGISTERS:
-                raise ValueError(f"Unknown register: {reg} in {mnemonic} instruction")
-            operand_binary = REGISTERS[reg] + "00" # n000 format (n=2bit, rest 0)
-        elif fmt == "address": # JMP addr, JZ addr
-            target_label = operands.strip()
-            if target_label not in labels:
-                raise ValueError(f"Undefined label: {target_label} in {mnemonic} instruction")
-            operand_binary = labels[target_label] # aaaa format (4-bit address)
+        machine_code.append(_encode(instruction_data.mnemonic, instruction_data.operands, labels))
+
+    return machine_code
+
+def assemble(assembly_code):
+    """
+    Parses and translates the assembly code in a single pass.
+    Jump targets are emitted as placeholders and patched once every label is known.
+    Returns the 8-bit machine code ints and a dict of labels.
+    """
+    machine_code = []
+    labels = {}
+    fixups = [] # (index, mnemonic, target_label) for JMP/JZ
+
+    for address, mnemonic, operands in _iter_instructions(assembly_code, labels):
+        if mnemonic in _JUMP_MNEMONICS: # Target may be a forward reference
+            fixups.append((address, mnemonic, operands))
+            machine_code.append(0) # Placeholder, patched below
         else:
-            raise ValueError(f"Unhandled format '{fmt}' for mnemonic: {mnemonic}")
+            machine_code.append(_encode(mnemonic, operands, labels))
 
-        full_binary_instruction = opcode + operand_binary
-        machine_code_binary.append(full_binary_instruction)
+    for index, mnemonic, target_label in fixups:
+        machine_code[index] = _encode(mnemonic, target_label, labels)
 
-    return machine_code_binary
+    return machine_code, labels
 
-def convert_binary_to_hex(binary_code_list):
+def convert_binary_to_hex(machine_code):
     """
-    Converts a list of 8-bit binary strings to 2-digit hex strings.
+    Converts a list of 8-bit machine code ints to 2-digit hex strings.
     """
-    hex_code_list = []
-    for binary_str in binary_code_list:
-        if len(binary_str) != 8:
-            raise ValueError(f"Binary string '{binary_str}' is not 8 bits long.")
-        hex_val = format(int(binary_str, 2), '02X') # Convert to int, then to 2-digit hex
-        hex_code_list.append(hex_val)
-    return hex_code_list
+    machine_code = list(machine_code) # bytes() would treat a bare int as a length
+    try:
+        packed = bytes(machine_code) # Rejects anything outside 0-255
+    except ValueError:
+        bad = next(byte for byte in machine_code if not 0 <= byte <= 0xFF)
+        raise ValueError(f"Machine code value '{bad}' is not 8 bits long.") from None
+    return packed.hex(' ').upper().split()
 
 # --- Main Translation Process ---
 if __name__ == "__main__":
-    print("Parsing assembly code...")
-    parsed_instructions, labels = parse_assembly(ASSEMBLY_CODE)
+    print("Parsing and translating assembly code...")
+    machine_code, labels = assemble(ASSEMBLY_CODE)
 
     print("\nLabels and their addresses:")
     for label, addr in labels.items():
-        print(f"  {label}: {addr} (binary)")
-
-    print("\nTranslating to machine code...")
-    machine_code_binary = translate_to_machine_code(parsed_instructions, labels)
+        print(f"  {label}: {format(addr, '04b')} (binary)")
 
     print("\nGenerated Binary Machine Code:")
-    for i, binary_instr in enumerate(machine_code_binary):
-        print(f"  Addr {format(i, '04b')}: {binary_instr}")
+    sys.stdout.write("".join(
+        f"  Addr {format(i, '04b')}: {format(byte, '08b')}\n" for i, byte in enumerate(machine_code)
+    ))
 
-    hex_machine_code = convert_binary_to_hex(machine_code_binary)
+    hex_machine_code = convert_binary_to_hex(machine_code)
 
     print("\n--- Logisim ROM Content (Hexadecimal) ---")
     print("v2.0 raw") # Logisim ROM header
-    for hex_val in hex_machine_code:
-        print(hex_val)
+    sys.stdout.write("".join(f"{hex_val}\n" for hex_val in hex_machine_code))
 
     print("\nTranslation complete.")
     print(f"Total instructions translated: {len(hex_machine_code)}")